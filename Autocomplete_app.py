@@ -1,10 +1,15 @@
 import pygame
 import sys
-from collections import deque
+import heapq
+from bisect import insort
+from array import array
+from collections import deque, OrderedDict
 
 pygame.init()
 
-SCREEN_WIDTH, SCREEN_HEIGHT, FPS, NODE_RADIUS = 1000, 600, 60, 18
+SCREEN_WIDTH, SCREEN_HEIGHT, NODE_RADIUS = 1000, 600, 18
+CURSOR_BLINK_MS = 500
+SUGGEST_CACHE_SIZE = 128
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -12,95 +17,183 @@ GRAY = (200, 200, 200)
 BLUE = (66, 133, 244)
 LIGHT_BLUE = (200, 220, 255)
 GREEN = (52, 168, 83)
+LIGHT_GREEN = (220, 255, 220)
 HIGHLIGHT_COLOR = (255, 235, 59)
 EDGE_COLOR = (180, 180, 180)
+
+# indexed by (path_flag << 1) | subtree_flag
+NODE_STYLES = ((WHITE, BLACK, 1), (LIGHT_GREEN, GREEN, 2),
+               (HIGHLIGHT_COLOR, BLUE, 3), (HIGHLIGHT_COLOR, BLUE, 3))
+EDGE_STYLES = ((EDGE_COLOR, 1), (GREEN, 2), (BLUE, 3), (BLUE, 3))
                                                                         
 FONT_SMALL = pygame.font.Font(None, 20)
 FONT_MEDIUM = pygame.font.Font(None, 26)
 FONT_INPUT = pygame.font.Font(None, 36)
 
+_GLYPH_CACHE = {}
+
+def _render_glyph(text, font):
+    key = (text, id(font))
+    surface = _GLYPH_CACHE.get(key)
+    if surface is None:
+        surface = _GLYPH_CACHE[key] = font.render(text, True, BLACK)
+    return surface
+
 class TrieNode:
-    def __init__(self, char=''):
-        self.char = char
-        self.children = {}
+    __slots__ = ('edge_label', 'children', 'is_end_of_word', 'word', 'idx')
+
+    def __init__(self, edge_label=''):
+        self.edge_label = edge_label
+        self.children = []
         self.is_end_of_word = False
         self.word = None  
-        self.x, self.y = 0, 0
-        self.is_path_node = False 
-        self.is_in_subtree = False
+        self.idx = 0
+
+    def get_child(self, char):
+        for c, child in self.children:
+            if c == char: return child
+        return None
+
+    def set_child(self, char, child):
+        for i, (c, _) in enumerate(self.children):
+            if c == char:
+                self.children[i] = (char, child)
+                return
+        insort(self.children, (char, child))
 
 class Trie:
     def __init__(self):
         self.root = TrieNode('*')
+        self._suggest_cache = OrderedDict()
+        self.path_indices = []
+        self.subtree_indices = []
+        self._all_nodes_cache = None
+        self.version = 0
+        self.word_count = 0
+        self.labels = []
+        self.end_flags = bytearray()
+        self.path_flags = bytearray()
+        self.subtree_flags = bytearray()
     
     def insert(self, word):
         if not word: return
         word = word.lower()
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode(char)
-            node = node.children[char]
+        node, i = self.root, 0
+        while i < len(word):
+            child = node.get_child(word[i])
+            if child is None:
+                child = TrieNode(word[i:])
+                node.set_child(word[i], child)
+            label = child.edge_label
+            k = 1
+            while k < len(label) and i + k < len(word) and label[k] == word[i + k]: k += 1
+            if k < len(label):
+                mid = TrieNode(label[:k])
+                child.edge_label = label[k:]
+                mid.set_child(child.edge_label[0], child)
+                node.set_child(word[i], mid)
+                child = mid
+            node, i = child, i + k
+        if not node.is_end_of_word: self.word_count += 1
         node.is_end_of_word = True
         node.word = word
+        self._invalidate()
+
+    def _invalidate(self):
+        self._suggest_cache.clear()
+        self._all_nodes_cache = None
+        self.version += 1
+
+    def _walk(self, prefix):
+        path, node, i = [], self.root, 0
+        while i < len(prefix):
+            node = node.get_child(prefix[i])
+            if node is None: return path, False
+            label = node.edge_label
+            path.append(node)
+            if not prefix.startswith(label, i):
+                return path, label.startswith(prefix[i:])
+            i += len(label)
+        return path, True
     
     def get_suggestions(self, prefix):
         if not prefix: return [], None
-        prefix = prefix.lower()
-        node = self.root
-        for char in prefix:
-            if char not in node.children: return [], None
-            node = node.children[char]
+        cached = self._suggest_cache.get(prefix)
+        if cached is not None:
+            self._suggest_cache.move_to_end(prefix)
+            return cached
+
+        path, found = self._walk(prefix)
+        if not found: return [], None
+        node = path[-1]
         
-        suggestions = []
-        self._collect_all_words(node, suggestions)
-        suggestions.sort(key=lambda x: (len(x), x))
+        suggestions = self._collect_all_words(node)
+
+        self._suggest_cache[prefix] = (suggestions, node)
+        if len(self._suggest_cache) > SUGGEST_CACHE_SIZE:
+            self._suggest_cache.popitem(last=False)
         return suggestions, node
     
-    def _collect_all_words(self, node, words, max_words=8): 
-        if len(words) >= max_words: return
-        if node.is_end_of_word: words.append(node.word)
-        for char in sorted(node.children.keys()):
-            self._collect_all_words(node.children[char], words, max_words)
+    def _collect_all_words(self, node, max_words=8):
+        words = []
+        queue = [(0, '', node)]
+        while queue and len(words) < max_words:
+            depth, suffix, node = heapq.heappop(queue)
+            if node.is_end_of_word: words.append(node.word)
+            for _, child in node.children:
+                label = child.edge_label
+                heapq.heappush(queue, (depth + len(label), suffix + label, child))
+        return words
     
     def highlight_path(self, prefix):
-        self._reset_highlights(self.root)
+        self._ensure_index()
+        path_flags, subtree_flags = self.path_flags, self.subtree_flags
+        for i in self.path_indices: path_flags[i] = 0
+        for i in self.subtree_indices: subtree_flags[i] = 0
+        self.path_indices, self.subtree_indices = [], []
         if not prefix: return
         
-        prefix = prefix.lower()
-        node = self.root
-        for char in prefix:
-            if char not in node.children: return
-            node = node.children[char]
-            node.is_path_node = True
-        self._mark_suggestion_subtree(node)
-    
-    def _reset_highlights(self, node):
-        node.is_path_node = False
-        node.is_in_subtree = False
-        for child in node.children.values():
-            self._reset_highlights(child)
+        path, found = self._walk(prefix)
+        for node in path:
+            path_flags[node.idx] = 1
+            self.path_indices.append(node.idx)
+        if found: self._mark_suggestion_subtree(path[-1])
     
     def _mark_suggestion_subtree(self, node):
-        node.is_in_subtree = True
-        for child in node.children.values():
-            self._mark_suggestion_subtree(child)
+        subtree_flags = self.subtree_flags
+        queue = deque([node])
+        while queue:
+            node = queue.popleft()
+            subtree_flags[node.idx] = 1
+            self.subtree_indices.append(node.idx)
+            queue.extend(child for _, child in node.children)
     
     def get_all_nodes(self):
+        self._ensure_index()
+        return self._all_nodes_cache
+
+    def _ensure_index(self):
+        if self._all_nodes_cache is not None: return
         nodes = []
         queue = deque([self.root])
         while queue:
             node = queue.popleft()
+            node.idx = len(nodes)
             nodes.append(node)
-            for child in node.children.values():
+            for _, child in node.children:
                 queue.append(child)
-        return nodes
+
+        self.labels = [node.edge_label for node in nodes]
+        self.end_flags = bytearray(node.is_end_of_word for node in nodes)
+        self.path_flags = bytearray(len(nodes))
+        self.subtree_flags = bytearray(len(nodes))
+        self.path_indices, self.subtree_indices = [], []
+        self._all_nodes_cache = nodes
 
 class TextBox:
     def __init__(self, x, y, width, height):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = ""
-        self.cursor_timer = 0
     
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -114,9 +207,8 @@ class TextBox:
                     return True
         return False
     
-    def update(self):
-        self.cursor_timer += 1
-        if self.cursor_timer >= 30: self.cursor_timer = 0
+    def cursor_visible(self):
+        return not (pygame.time.get_ticks() // CURSOR_BLINK_MS) & 1
     
     def draw(self, screen):
         pygame.draw.rect(screen, WHITE, self.rect, border_radius=8)
@@ -124,7 +216,7 @@ class TextBox:
         text_surface = FONT_INPUT.render(self.text, True, BLACK)
         screen.blit(text_surface, (self.rect.x + 15, self.rect.y + 12))
         
-        if self.cursor_timer < 15:
+        if self.cursor_visible():
             cursor_x = self.rect.x + 15 + text_surface.get_width() + 2
             pygame.draw.line(screen, BLACK, (cursor_x, self.rect.y + 10), 
                              (cursor_x, self.rect.y + 35), 2)
@@ -138,86 +230,130 @@ class TrieVisualizer:
         self.horizontal_spacing = 40
         self.start_y = 100
         self.draw_area_width = SCREEN_WIDTH 
+        self.node_widths = array('i')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.parents = array('i')
+        self._edge_layer = None
+        self._node_layer = None
+        self._layer_bounds = None
+        self._positions_version = None
 
     def calculate_node_positions(self, trie):
-        if not trie.root: return
-
-        leaf_counts = {}
-        def get_leaf_count(node):
-            if not node.children:
-                leaf_counts[node] = 1
-                return 1
-            count = sum(get_leaf_count(child) for child in node.children.values())
-            leaf_counts[node] = count
-            return count
-
-        root_leaves = get_leaf_count(trie.root)
-        total_tree_width = root_leaves * self.horizontal_spacing
+        if self._positions_version == trie.version: return
+
+        nodes = trie.get_all_nodes()
+        node_widths = array('i', [2 * NODE_RADIUS]) * len(nodes)
+        for i, label in enumerate(trie.labels):
+            if len(label) > 1:
+                text_width = _render_glyph(label.upper(), FONT_SMALL).get_width()
+                node_widths[i] = max(2 * NODE_RADIUS, text_width + 16)
+        padding = self.horizontal_spacing - 2 * NODE_RADIUS
+
+        subtree_widths = [0] * len(nodes)
+        stack = [(trie.root, iter(trie.root.children))]
+        while stack:
+            node, children = stack[-1]
+            entry = next(children, None)
+            if entry is not None:
+                child = entry[1]
+                stack.append((child, iter(child.children)))
+                continue
+            stack.pop()
+            children_width = sum(subtree_widths[c.idx] for _, c in node.children)
+            subtree_widths[node.idx] = max(children_width, node_widths[node.idx] + padding)
+
+        total_tree_width = subtree_widths[trie.root.idx]
         start_x = (self.draw_area_width - total_tree_width) // 2
         if start_x < 20: start_x = 20
 
-        def position_node(node, x, y):
-            node_width = leaf_counts[node] * self.horizontal_spacing
-            node.x = x + node_width // 2
-            node.y = y
+        xs, ys = array('i', [0]) * len(nodes), array('i', [0]) * len(nodes)
+        parents = array('i', [0]) * len(nodes)
+        queue = deque([(trie.root, start_x, self.start_y)])
+        while queue:
+            node, x, y = queue.popleft()
+            node_width = subtree_widths[node.idx]
+            xs[node.idx] = x + node_width // 2
+            ys[node.idx] = y
             
-            current_x = x
-            sorted_children = sorted(node.children.values(), key=lambda n: n.char)
-            for child in sorted_children:
-                child_pixel_width = leaf_counts[child] * self.horizontal_spacing
-                position_node(child, current_x, y + self.level_height)
+            children_width = sum(subtree_widths[c.idx] for _, c in node.children)
+            current_x = x + (node_width - children_width) // 2
+            for _, child in node.children:
+                child_pixel_width = subtree_widths[child.idx]
+                parents[child.idx] = node.idx
+                queue.append((child, current_x, y + self.level_height))
                 current_x += child_pixel_width
 
-        position_node(trie.root, start_x, self.start_y)
+        self.node_widths, self.xs, self.ys, self.parents = node_widths, xs, ys, parents
 
-    def draw_structure(self, screen, trie):
-        if not trie.root.children:
-            trie.root.x = SCREEN_WIDTH // 2
-            trie.root.y = self.start_y
-            self._draw_node(screen, trie.root)
-            return
+        self._edge_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        color, width = EDGE_STYLES[0]
+        for i in range(1, len(nodes)):
+            p = parents[i]
+            pygame.draw.line(self._edge_layer, color, (xs[p], ys[p]), (xs[i], ys[i]), width)
+        self._node_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        for i in range(len(nodes)):
+            self._draw_node(self._node_layer, trie, i, plain=True)
 
-        self._draw_edges(screen, trie.root)
-        for node in trie.get_all_nodes():
-            self._draw_node(screen, node)
+        left = min(xs[i] - node_widths[i] // 2 for i in range(len(nodes)))
+        right = max(xs[i] + node_widths[i] // 2 for i in range(len(nodes)))
+        self._layer_bounds = pygame.Rect(left - 1, min(ys) - NODE_RADIUS - 1, right - left + 2,
+                                         max(ys) - min(ys) + 2 * NODE_RADIUS + 2)
+        self._positions_version = trie.version
 
-    def _draw_edges(self, screen, node):
-        for child in node.children.values():
-            if child.is_path_node:
-                color, width = BLUE, 3
-            elif child.is_in_subtree:
-                color, width = GREEN, 2
-            else:
-                color, width = EDGE_COLOR, 1
-            
-            pygame.draw.line(screen, color, (node.x, node.y), (child.x, child.y), width)
-            self._draw_edges(screen, child)
-
-    def _draw_node(self, screen, node):
-        if node.is_path_node:
-            color, border_color, border_width = HIGHLIGHT_COLOR, BLUE, 3
-        elif node.is_in_subtree:
-            color, border_color, border_width = (220, 255, 220), GREEN, 2
-        else:
-            color, border_color, border_width = WHITE, BLACK, 1
-        
-        pygame.draw.circle(screen, color, (node.x, node.y), NODE_RADIUS)
-        pygame.draw.circle(screen, border_color, (node.x, node.y), NODE_RADIUS, border_width)
+    def draw_structure(self, screen, trie):
+        self.calculate_node_positions(trie)
+        xs, ys, parents = self.xs, self.ys, self.parents
+        bounds = self._layer_bounds
+        screen.blit(self._edge_layer, bounds, bounds)
+
+        path_flags = trie.path_flags
+        color, width = EDGE_STYLES[1]
+        for i in trie.subtree_indices:
+            if path_flags[i]: continue
+            p = parents[i]
+            pygame.draw.line(screen, color, (xs[p], ys[p]), (xs[i], ys[i]), width)
+
+        if trie.path_indices:
+            color, width = EDGE_STYLES[2]
+            path_points = [(xs[0], ys[0])] + [(xs[i], ys[i]) for i in trie.path_indices]
+            pygame.draw.lines(screen, color, False, path_points, width)
+
+        screen.blit(self._node_layer, bounds, bounds)
+        for i in trie.path_indices:
+            self._draw_node(screen, trie, i)
+        for i in trie.subtree_indices:
+            if not path_flags[i]: self._draw_node(screen, trie, i)
+
+    def _draw_node(self, screen, trie, i, plain=False):
+        pos = (self.xs[i], self.ys[i])
+        style = 0 if plain else (trie.path_flags[i] << 1) | trie.subtree_flags[i]
+        color, border_color, border_width = NODE_STYLES[style]
         
-        if node.is_end_of_word:
-            pygame.draw.circle(screen, border_color, (node.x, node.y), NODE_RADIUS - 4, 1)
+        label = trie.labels[i]
+        if len(label) == 1:
+            pygame.draw.circle(screen, color, pos, NODE_RADIUS)
+            pygame.draw.circle(screen, border_color, pos, NODE_RADIUS, border_width)
+            if trie.end_flags[i]:
+                pygame.draw.circle(screen, border_color, pos, NODE_RADIUS - 4, 1)
+        else:
+            rect = pygame.Rect(0, 0, self.node_widths[i], 2 * NODE_RADIUS)
+            rect.center = pos
+            pygame.draw.rect(screen, color, rect, border_radius=NODE_RADIUS)
+            pygame.draw.rect(screen, border_color, rect, border_width, border_radius=NODE_RADIUS)
+            if trie.end_flags[i]:
+                pygame.draw.rect(screen, border_color, rect.inflate(-8, -8), 1,
+                                 border_radius=NODE_RADIUS - 4)
         
-        char_text = node.char.upper()
-        font = FONT_MEDIUM if node.char == 'R' else FONT_SMALL
-        text_surface = font.render(char_text, True, BLACK)
-        text_rect = text_surface.get_rect(center=(node.x, node.y))
+        font = FONT_MEDIUM if label == 'R' else FONT_SMALL
+        text_surface = _render_glyph(label.upper(), font)
+        text_rect = text_surface.get_rect(center=pos)
         screen.blit(text_surface, text_rect)
 
 class AutocompleteApp:
     def __init__(self):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Trie Autocomplete Visualizer")
-        self.clock = pygame.time.Clock()
         self.running = True
         
         self.trie = Trie()
@@ -229,6 +365,8 @@ class AutocompleteApp:
         self.visualizer.calculate_node_positions(self.trie)
         
         self.suggestion_rect = None
+        self._dirty = True
+        self._cursor_visible = self.textbox.cursor_visible()
 
     def load_initial_words(self):
         words = ["algo", "aufa", "alga", "apple", "batik", "batu", "bata", "baca", 
@@ -236,9 +374,11 @@ class AutocompleteApp:
                  "data", "date", "diskrit", "fathan", "hedo", "zahy", "zara", "zebra"]
         for word in words: self.trie.insert(word)
     
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events):
+        for event in events:
             if event.type == pygame.QUIT: self.running = False
+            if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.WINDOWEXPOSED):
+                self._dirty = True
             
             if self.textbox.handle_event(event):
                 self.update_autocomplete()
@@ -253,10 +393,11 @@ class AutocompleteApp:
                         self.update_autocomplete()
     
     def update_autocomplete(self):
-        prefix = self.textbox.get_text()
-        suggestions, _ = self.trie.get_suggestions(prefix) 
+        prefix = self.textbox.get_text().lower()
+        suggestions, _ = self.trie.get_suggestions(prefix)
         self.current_suggestions = suggestions
         self.trie.highlight_path(prefix)
+        self._dirty = True
     
     def draw_suggestions(self):
         if not self.current_suggestions:
@@ -299,7 +440,7 @@ class AutocompleteApp:
         font_info = pygame.font.Font(None, 22)
 
         prefix = self.textbox.get_text()
-        total_words = sum(1 for node in self.trie.get_all_nodes() if node.is_end_of_word)
+        total_words = self.trie.word_count
         
         disp_prefix = (prefix[:10] + '..') if len(prefix) > 10 else prefix
 
@@ -318,7 +459,7 @@ class AutocompleteApp:
         
         keterangan = [
             (HIGHLIGHT_COLOR, BLUE, "Lintasan Prefix", 3),
-            ((220, 255, 220), GREEN, "Saran Kata", 2),
+            (LIGHT_GREEN, GREEN, "Saran Kata", 2),
             (WHITE, BLACK, "Akhir Kata", 2),
         ]
         
@@ -349,10 +490,18 @@ class AutocompleteApp:
 
     def run(self):
         while self.running:
-            self.handle_events()
-            self.textbox.update()
-            self.draw()
-            self.clock.tick(FPS)
+            cursor_visible = self.textbox.cursor_visible()
+            if cursor_visible != self._cursor_visible:
+                self._cursor_visible = cursor_visible
+                self._dirty = True
+
+            if self._dirty:
+                self.draw()
+                self._dirty = False
+
+            event = pygame.event.wait(CURSOR_BLINK_MS - pygame.time.get_ticks() % CURSOR_BLINK_MS)
+            if event.type != pygame.NOEVENT:
+                self.handle_events([event] + pygame.event.get())
         
         pygame.quit()
         sys.exit()